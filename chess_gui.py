@@ -3,15 +3,18 @@ import os
 import chess
 from stockfish_engine import StockfishEngine
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout, 
-                           QVBoxLayout, QListWidget, QDialog, QPushButton, 
-                           QInputDialog, QMessageBox)
-from PyQt5.QtCore import QUrl
+                           QVBoxLayout, QListView, QDialog, QPushButton, 
+                           QInputDialog, QMessageBox, QFileDialog, QShortcut)
+from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 
 from gui_components.chessboard import ChessboardWidget
 from gui_components.dialogs import ColorDialog
 from gui_components.settings import SettingsDialog
 from gui_components.engine_thread import EngineThread
+from gui_components.move_list import GameHistory, MoveListModel
+from gui_components.pgn_loader import PgnLoaderThread
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +25,10 @@ class MainWindow(QMainWindow):
         self.player_color = None
         self.board_flipped = False
         self.last_move = None
+        self.premoves = []
+        self.view_ply = None
+        self.view_board = None
+        self.pgn_thread = None
         self.script_dir = os.path.dirname(os.path.realpath(__file__))
         self.sound_player = QMediaPlayer()
         self.engine = StockfishEngine(depth=20)
@@ -37,9 +44,24 @@ class MainWindow(QMainWindow):
 
         right_panel = QVBoxLayout()
         layout.addLayout(right_panel)
-        self.move_list = QListWidget()
+        self.move_list_model = MoveListModel(GameHistory(self.board))
+        self.move_list = QListView()
+        self.move_list.setModel(self.move_list_model)
+        self.move_list.setUniformItemSizes(True)
+        self.move_list.clicked.connect(self.on_move_list_clicked)
         right_panel.addWidget(self.move_list)
 
+        nav_layout = QHBoxLayout()
+        for text, key, slot in (("|<", Qt.Key_Home, self.go_home),
+                                ("<", Qt.Key_Left, self.go_back),
+                                (">", Qt.Key_Right, self.go_forward),
+                                (">|", Qt.Key_End, self.go_end)):
+            nav_button = QPushButton(text)
+            nav_button.clicked.connect(slot)
+            nav_layout.addWidget(nav_button)
+            QShortcut(QKeySequence(key), self, slot)
+        right_panel.addLayout(nav_layout)
+
         button_layout = QHBoxLayout()
         new_game_button = QPushButton("New Game")
         new_game_button.clicked.connect(self.start_new_game)
@@ -49,6 +71,10 @@ class MainWindow(QMainWindow):
         fen_button.clicked.connect(self.load_fen)
         button_layout.addWidget(fen_button)
 
+        pgn_button = QPushButton("Load PGN")
+        pgn_button.clicked.connect(self.load_pgn)
+        button_layout.addWidget(pgn_button)
+
         settings_button = QPushButton("Settings")
         settings_button.clicked.connect(self.open_settings)
         button_layout.addWidget(settings_button)
@@ -66,8 +92,7 @@ class MainWindow(QMainWindow):
 
     def start_new_game(self):
         self.board.reset()
-        self.move_list.clear()
-        self.last_move = None
+        self.reset_history()
         self.chessboard_widget.update()
         self.start_game()
 
@@ -76,17 +101,84 @@ class MainWindow(QMainWindow):
         if ok and fen:
             try:
                 self.board.set_fen(fen)
-                self.move_list.clear()
-                self.last_move = None
+                self.reset_history()
                 self.chessboard_widget.update()
                 self.start_game()
             except ValueError:
                 print("Invalid FEN string")
 
+    def load_pgn(self):
+        # Replacing a running QThread would destroy it mid-import and abort the app
+        if self.pgn_thread is not None and self.pgn_thread.isRunning():
+            print("A PGN file is still loading")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Load PGN", "", "PGN files (*.pgn);;All files (*)")
+        if path:
+            self.pgn_thread = PgnLoaderThread(path)
+            self.pgn_thread.game_loaded.connect(self.handle_pgn_loaded)
+            self.pgn_thread.start()
+
+    def handle_pgn_loaded(self, history):
+        """Show an imported game for review; the engine stays idle until a new game."""
+        if history is None:
+            print("Invalid PGN file")
+            return
+        self.board = history.tip.copy()
+        self.player_color = None
+        self.premoves.clear()
+        self.last_move = history.moves[-1] if history.moves else None
+        self.move_list_model.set_history(history)
+        self.go_end()
+
+    def reset_history(self):
+        """Start an empty move list from the current board position."""
+        self.last_move = None
+        self.premoves.clear()
+        self.view_ply = None
+        self.view_board = None
+        self.move_list_model.set_history(GameHistory(self.board))
+
+    def current_ply(self):
+        if self.view_ply is None:
+            return len(self.move_list_model.history)
+        return self.view_ply
+
+    def go_to_ply(self, ply):
+        history = self.move_list_model.history
+        ply = max(0, min(ply, len(history)))
+        if ply == len(history):
+            self.view_ply = None
+            self.view_board = None
+        else:
+            self.view_ply = ply
+            self.view_board = history.board_at(ply)
+        if ply:
+            self.move_list.setCurrentIndex(self.move_list_model.index(self.move_list_model.row_for_ply(ply)))
+        else:
+            self.move_list.clearSelection()
+        self.chessboard_widget.update()
+
+    def go_home(self):
+        self.go_to_ply(0)
+
+    def go_back(self):
+        self.go_to_ply(self.current_ply() - 1)
+
+    def go_forward(self):
+        self.go_to_ply(self.current_ply() + 1)
+
+    def go_end(self):
+        self.go_to_ply(len(self.move_list_model.history))
+
+    def on_move_list_clicked(self, index):
+        self.go_to_ply(self.move_list_model.last_ply_in_row(index.row()))
+
     def start_game(self):
         if not self.engine.is_available():
             print("Stockfish engine is not available. Please install Stockfish binary.")
             return
+        if self.engine.is_fallback():
+            print("Stockfish binary not found: playing against the weaker built-in engine.")
 
         dialog = ColorDialog(self)
         if dialog.exec_() == QDialog.Accepted:
@@ -110,23 +202,22 @@ class MainWindow(QMainWindow):
         except Exception as e:
             print(f"Could not play sound {sound_file}: {e}")
 
-    def handle_move(self, move):
+    def handle_move(self, move, process_events=True):
         is_capture = self.board.is_capture(move)
         is_castling = self.board.is_castling(move)
         is_promotion = move.promotion is not None
 
-        if self.board.turn == chess.WHITE:
-            san_move = self.board.san(move)
-            self.move_list.addItem(f"{self.board.fullmove_number}. {san_move}")
-        else:
-            san_move = self.board.san(move)
-            last_item = self.move_list.item(self.move_list.count() - 1)
-            last_item.setText(f"{last_item.text()} {san_move}")
-
+        self.move_list_model.append_move(move)
         self.board.push(move)
         self.last_move = move
+        if self.board.is_game_over():
+            # Queued premoves would otherwise be drawn on top of the final position
+            self.premoves.clear()
+        if self.view_ply is None:
+            self.move_list.setCurrentIndex(self.move_list_model.index(self.move_list_model.rowCount() - 1))
         self.chessboard_widget.update()
-        QApplication.processEvents()
+        if process_events:
+            QApplication.processEvents()
         
         if self.board.is_game_over():
             self.play_sound("sound/game-end.mp3")
@@ -151,8 +242,70 @@ class MainWindow(QMainWindow):
         self.engine_thread.start()
 
     def handle_engine_move(self, move):
+        # Drop replies computed for a position that has since been replaced
+        if self.player_color is None or self.sender().board_fen != self.board.fen():
+            return
         if move:
+            # Skip the repaint round-trip when a premove is about to follow
+            self.handle_move(move, process_events=not self.premoves)
+            self.play_premove()
+
+    def queue_premove(self, move):
+        """Queue a tentative move to be played as soon as the engine replies."""
+        board = self.premove_board()
+        board.turn = self.player_color
+        if move not in self.premove_moves(board, move.from_square):
+            return
+        self.premoves.append(move)
+        self.chessboard_widget.update()
+
+    def clear_premoves(self):
+        self.premoves.clear()
+        self.chessboard_widget.update()
+
+    def premove_board(self):
+        """Copy of the board with the queued premoves applied on top."""
+        board = self.board.copy(stack=False)
+        for move in self.premoves:
+            # The engine may have captured or blocked the premoved piece
+            if board.color_at(move.from_square) != self.player_color:
+                break
+            board.turn = self.player_color
+            board.push(move)
+        return board
+
+    def premove_moves(self, board, from_square):
+        """Tentative moves for the piece on from_square, with the player to move on board.
+
+        Pseudo-legal moves, plus captures of the player's own pieces: the engine
+        may take them before the premove is played.
+        """
+        moves = [move for move in board.pseudo_legal_moves if move.from_square == from_square]
+        piece = board.piece_at(from_square)
+        if piece is None or piece.color != self.player_color:
+            return moves
+        promotes = piece.piece_type == chess.PAWN
+        for to_square in board.attacks(from_square) & board.occupied_co[self.player_color]:
+            if promotes and chess.square_rank(to_square) in (0, 7):
+                moves.extend(chess.Move(from_square, to_square, promotion=promotion)
+                             for promotion in (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT))
+            else:
+                moves.append(chess.Move(from_square, to_square))
+        return moves
+
+    def play_premove(self):
+        """Play the first queued premove if it is legal in the new position.
+
+        The remaining premoves depend on the first one, so an illegal premove
+        drops the whole queue.
+        """
+        if not self.premoves or self.board.is_game_over() or self.board.turn != self.player_color:
+            return
+        move = self.premoves.pop(0)
+        if move in self.board.legal_moves:
             self.handle_move(move)
+        else:
+            self.clear_premoves()
 
     def show_game_end_dialog(self):
         result = self.board.result()
@@ -198,8 +351,7 @@ class MainWindow(QMainWindow):
     def rematch(self):
         """Start a new game with the same player color"""
         self.board.reset()
-        self.move_list.clear()
-        self.last_move = None
+        self.reset_history()
         self.chessboard_widget.update()
         # Start the game with the same color - no dialog needed
         if self.board.turn != self.player_color:
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Engine worker daemon: serves one or more local engines over TCP so
+StockfishEngine(remote=...) can run searches on other machines.
+
+Usage:
+    python engine_worker.py --host 0.0.0.0 --port 7878 --engines 4   # trusted network only
+    STOCKFISH_REMOTE=host1:7878,host2:7878 python chess_gui.py
+
+See remote_engine.py for the wire protocol.
+"""
+
+import argparse
+import os
+import queue
+import socketserver
+import sys
+import threading
+
+import chess
+from remote_engine import DEFAULT_PORT, read_message, send_message
+from stockfish_engine import StockfishEngine
+
+
+class EngineWorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, engines=1, depth=20, parameters=None):
+        super().__init__(address, _EngineRequestHandler)
+        self.engine_count = engines
+        self.depth = depth
+        self.parameters = parameters
+        self.backends = set()
+        self.engines = queue.Queue()
+        for _ in range(engines):
+            self.engines.put(self._new_engine())
+
+    def _new_engine(self):
+        # remote=False: a worker must never forward to other workers
+        engine = StockfishEngine(depth=self.depth, parameters=self.parameters, remote=False)
+        # Sticky: a respawn that landed on the fallback keeps being reported
+        self.backends.add(engine.backend)
+        return engine
+
+    def status(self):
+        return {"engines": self.engine_count, "busy": self.engine_count - self.engines.qsize(),
+                "backends": sorted(self.backends)}
+
+    def run(self, message):
+        op = message.get("op")
+        if op == "status":
+            return self.status()
+        if op not in ("best_move", "evaluation", "top_moves"):
+            raise BadRequest(f"unknown op {op!r}")
+        # Everything reaching the engine is rebuilt from parsed values: the
+        # wrapper writes strings straight into UCI commands.
+        try:
+            fen = _validated_fen(message.get("fen"))
+            time_ms = int(message.get("time_ms") or 0)
+            count = int(message.get("count", 5))
+        except (TypeError, ValueError) as e:
+            raise BadRequest(str(e)) from e
+
+        engine = self.engines.get()
+        try:
+            if not _is_alive(engine):
+                engine = self._new_engine()
+            # Engines are shared between clients, so reset every setting per request
+            skill = message.get("skill")
+            engine.set_skill(20 if skill is None else skill)
+            if message.get("elo") is not None:
+                engine.set_elo(message["elo"])
+            else:
+                engine.set_depth(message.get("depth") or engine.depth)
+            backend = engine.engine
+            backend.set_fen_position(fen)
+            if op == "best_move":
+                if time_ms:
+                    return backend.get_best_move_time(time_ms)
+                return backend.get_best_move()
+            if op == "evaluation":
+                return backend.get_evaluation()
+            return backend.get_top_moves(count)
+        finally:
+            self.engines.put(engine)
+
+
+class BadRequest(ValueError):
+    """The request itself is invalid; another worker would reject it too."""
+
+
+def _validated_fen(fen):
+    """Canonical FEN for a valid position; raises ValueError for anything else."""
+    if not isinstance(fen, str):
+        raise ValueError("missing or non-string fen")
+    board = chess.Board(fen)
+    if not board.is_valid():
+        raise ValueError(f"invalid position: {fen!r}")
+    return board.fen()
+
+
+def _is_alive(engine):
+    # The PyPI wrapper keeps its Stockfish subprocess in `_stockfish`; other
+    # backends have no process to lose.
+    process = getattr(engine.engine, "_stockfish", None)
+    return process is None or process.poll() is None
+
+
+class _EngineRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                message = read_message(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            except ValueError as e:
+                send_message(self.wfile, {"ok": False, "error": f"bad request: {e}"})
+                continue
+            try:
+                reply = {"ok": True, "result": self.server.run(message)}
+            except BadRequest as e:
+                reply = {"ok": False, "error": str(e)}
+            except Exception as e:
+                # Engine-side failure (e.g. Stockfish crashed mid-search): the client may retry elsewhere
+                reply = {"ok": False, "error": str(e), "retry": True}
+            try:
+                send_message(self.wfile, reply)
+            except OSError:
+                return
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, engines=1, depth=20, parameters=None):
+    """
+    Start a worker in a background thread and return the server; port 0 picks
+    a free port (see server.server_address). Handy for running several
+    workers on localhost.
+    """
+    server = EngineWorkerServer((host, port), engines, depth, parameters)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve local chess engines over TCP.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="interface to listen on; the protocol has no authentication, "
+                             "so only expose it (e.g. 0.0.0.0) on a trusted network")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--engines", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="engine processes to run (default: half the cores)")
+    parser.add_argument("--threads", type=int, default=2, help="Threads per engine")
+    parser.add_argument("--hash", type=int, default=64, help="Hash MB per engine")
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--allow-fallback", action="store_true",
+                        help="serve the built-in engine when no Stockfish binary is found")
+    args = parser.parse_args(argv)
+
+    server = EngineWorkerServer((args.host, args.port), args.engines, args.depth,
+                                {"Threads": args.threads, "Hash": args.hash})
+    if "fallback" in server.backends:
+        if not args.allow_fallback:
+            print("Stockfish binary not found: refusing to serve the weak built-in engine. "
+                  "Install Stockfish, set STOCKFISH_BINARY, or pass --allow-fallback.")
+            server.server_close()
+            return 1
+        print("WARNING: serving the built-in fallback engine; clients will see is_fallback() == True.")
+    print(f"Engine worker listening on {args.host}:{args.port} with {args.engines} engine(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,494 @@
+"""
+Built-in fallback engine used by StockfishEngine when no Stockfish binary
+is available.
+
+Pure python on top of python-chess: iterative-deepening alpha-beta with
+quiescence search, a fixed-size transposition table, MVV-LVA / killer /
+history move ordering and a tapered material + piece-square evaluation
+that is updated incrementally on every push/pop.
+
+It mimics the subset of the PyPI 'stockfish' API that StockfishEngine
+uses, so the wrapper can swap it in transparently.
+"""
+
+import random
+import time
+from array import array
+
+import chess
+
+MATE = 100000
+MATE_BOUND = MATE - 1000     # scores beyond this are mate scores
+MAX_PLY = 64
+TT_BITS = 18                 # 2**18 table slots
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TIME_CHECK_NODES = 1024
+# Depth searches have no clock in the wrapper API; cap them so that
+# "depth 20" stays responsive in pure python.
+DEPTH_SEARCH_TIME_MS = 1500
+TOP_MOVES_DEPTH = 4
+
+# PeSTO material values (middlegame, endgame) and game-phase weights
+MG_VALUE = [0, 82, 337, 365, 477, 1025, 0]
+EG_VALUE = [0, 94, 281, 297, 512, 936, 0]
+PHASE_WEIGHT = [0, 0, 1, 1, 2, 4, 0]
+PHASE_TOTAL = 24
+
+# Piece-square tables from White's side, listed a8..h8 down to a1..h1
+# (simplified evaluation function; the king has separate endgame table).
+_PAWN = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+]
+_KNIGHT = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+_BISHOP = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+_ROOK = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+]
+_QUEEN = [
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+_KING_MG = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+]
+_KING_EG = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]
+_MG_TABLES = [None, _PAWN, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_MG]
+_EG_TABLES = [None, _PAWN, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_EG]
+
+
+def _piece_index(color, piece_type):
+    return (0 if color == chess.WHITE else 6) + piece_type - 1
+
+
+def _build_tables():
+    """Flat [piece_index * 64 + square] arrays with material + PST, signed for White."""
+    mg = array("i", [0] * 12 * 64)
+    eg = array("i", [0] * 12 * 64)
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        for piece_type in chess.PIECE_TYPES:
+            base = _piece_index(color, piece_type) * 64
+            for square in chess.SQUARES:
+                # Tables are written from White's side with a8 first
+                row = square ^ 56 if color == chess.WHITE else square
+                mg[base + square] = sign * (MG_VALUE[piece_type] + _MG_TABLES[piece_type][row])
+                eg[base + square] = sign * (EG_VALUE[piece_type] + _EG_TABLES[piece_type][row])
+    return mg, eg
+
+
+MG_TABLE, EG_TABLE = _build_tables()
+
+_rng = random.Random(20240601)
+ZOBRIST_PIECES = [_rng.getrandbits(64) for _ in range(12 * 64)]
+ZOBRIST_TURN = _rng.getrandbits(64)
+ZOBRIST_CASTLING = {}
+ZOBRIST_EP = [_rng.getrandbits(64) for _ in range(8)]
+
+
+def _castling_key(rights):
+    key = ZOBRIST_CASTLING.get(rights)
+    if key is None:
+        key = ZOBRIST_CASTLING[rights] = _rng.getrandbits(64)
+    return key
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class Position:
+    """
+    python-chess board plus an incrementally updated evaluation and hash.
+    `mg`/`eg` are White-relative centipawns, `phase` counts non-pawn material.
+    """
+    def __init__(self, board):
+        self.board = board.copy()
+        self.mg = self.eg = self.phase = self.pieces_key = 0
+        for square, piece in self.board.piece_map().items():
+            index = _piece_index(piece.color, piece.piece_type) * 64 + square
+            self.mg += MG_TABLE[index]
+            self.eg += EG_TABLE[index]
+            self.phase += PHASE_WEIGHT[piece.piece_type]
+            self.pieces_key ^= ZOBRIST_PIECES[index]
+        self.undo = []
+
+    def key(self):
+        board = self.board
+        key = self.pieces_key ^ _castling_key(board.castling_rights)
+        if board.turn == chess.BLACK:
+            key ^= ZOBRIST_TURN
+        if board.ep_square is not None:
+            key ^= ZOBRIST_EP[chess.square_file(board.ep_square)]
+        return key
+
+    def evaluate(self):
+        """Tapered score in centipawns from the side to move's point of view."""
+        phase = min(self.phase, PHASE_TOTAL)
+        score = (self.mg * phase + self.eg * (PHASE_TOTAL - phase)) // PHASE_TOTAL
+        return score if self.board.turn == chess.WHITE else -score
+
+    def push(self, move):
+        board = self.board
+        self.undo.append((self.mg, self.eg, self.phase, self.pieces_key))
+        color = board.turn
+        from_sq, to_sq = move.from_square, move.to_square
+        piece_type = board.piece_type_at(from_sq)
+        mover = _piece_index(color, piece_type) * 64
+
+        mg = self.mg - MG_TABLE[mover + from_sq]
+        eg = self.eg - EG_TABLE[mover + from_sq]
+        key = self.pieces_key ^ ZOBRIST_PIECES[mover + from_sq]
+
+        if board.is_castling(move):
+            rank = chess.square_rank(from_sq)
+            if chess.square_file(to_sq) > chess.square_file(from_sq):
+                rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+            else:
+                rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+            rook = _piece_index(color, chess.ROOK) * 64
+            mg += MG_TABLE[rook + rook_to] - MG_TABLE[rook + rook_from]
+            eg += EG_TABLE[rook + rook_to] - EG_TABLE[rook + rook_from]
+            key ^= ZOBRIST_PIECES[rook + rook_from] ^ ZOBRIST_PIECES[rook + rook_to]
+        else:
+            captured_sq = to_sq
+            if board.is_en_passant(move):
+                captured_sq = to_sq - 8 if color == chess.WHITE else to_sq + 8
+            captured_type = board.piece_type_at(captured_sq)
+            if captured_type:
+                victim = _piece_index(not color, captured_type) * 64 + captured_sq
+                mg -= MG_TABLE[victim]
+                eg -= EG_TABLE[victim]
+                key ^= ZOBRIST_PIECES[victim]
+                self.phase -= PHASE_WEIGHT[captured_type]
+
+        if move.promotion:
+            mover = _piece_index(color, move.promotion) * 64
+            self.phase += PHASE_WEIGHT[move.promotion]
+        mg += MG_TABLE[mover + to_sq]
+        eg += EG_TABLE[mover + to_sq]
+        key ^= ZOBRIST_PIECES[mover + to_sq]
+
+        self.mg, self.eg, self.pieces_key = mg, eg, key
+        board.push(move)
+
+    def pop(self):
+        self.board.pop()
+        self.mg, self.eg, self.phase, self.pieces_key = self.undo.pop()
+
+
+class Searcher:
+    def __init__(self, tt_bits=TT_BITS):
+        self.tt_mask = (1 << tt_bits) - 1
+        self.tt = [None] * (1 << tt_bits)
+        self.clear()
+
+    def clear(self):
+        self.tt[:] = [None] * len(self.tt)
+        self.history = array("i", [0] * 64 * 64)
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+
+    # ------------- Move ordering -------------
+
+    def _ordered(self, pos, moves, ply, tt_move):
+        board = pos.board
+        scored = []
+        for move in moves:
+            if move == tt_move:
+                score = 1 << 30
+            elif board.is_capture(move):
+                victim = board.piece_type_at(move.to_square) or chess.PAWN  # en passant
+                attacker = board.piece_type_at(move.from_square)
+                score = (1 << 28) + victim * 16 - attacker
+            elif move.promotion:
+                score = (1 << 27) + move.promotion
+            elif move in self.killers[ply]:
+                score = 1 << 26
+            else:
+                score = self.history[move.from_square * 64 + move.to_square]
+            scored.append((score, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    # ------------- Search -------------
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0 and self.deadline and time.monotonic() > self.deadline:
+            raise _SearchTimeout()
+
+    def quiesce(self, pos, alpha, beta, ply):
+        self._tick()
+        stand_pat = pos.evaluate()
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        board = pos.board
+        tactical = [m for m in board.generate_legal_moves() if m.promotion or board.is_capture(m)]
+        for move in self._ordered(pos, tactical, ply, None):
+            pos.push(move)
+            score = -self.quiesce(pos, -beta, -alpha, ply + 1)
+            pos.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def alphabeta(self, pos, depth, alpha, beta, ply):
+        board = pos.board
+        if ply and (board.halfmove_clock >= 100 or board.is_repetition(2)):
+            return 0
+        if depth <= 0:
+            return self.quiesce(pos, alpha, beta, ply)
+        self._tick()
+
+        key = pos.key()
+        slot = key & self.tt_mask
+        entry = self.tt[slot]
+        tt_move = None
+        if entry and entry[0] == key:
+            _, tt_depth, tt_score, tt_flag, tt_move = entry
+            if ply and tt_depth >= depth:
+                tt_score = _from_tt(tt_score, ply)
+                if tt_flag == TT_EXACT:
+                    return tt_score
+                if tt_flag == TT_LOWER and tt_score >= beta:
+                    return tt_score
+                if tt_flag == TT_UPPER and tt_score <= alpha:
+                    return tt_score
+
+        moves = list(board.generate_legal_moves())
+        if not moves:
+            return -MATE + ply if board.is_check() else 0
+
+        original_alpha = alpha
+        best_score, best_move = -MATE, None
+        for move in self._ordered(pos, moves, ply, tt_move):
+            pos.push(move)
+            score = -self.alphabeta(pos, depth - 1, -beta, -alpha, ply + 1)
+            pos.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+                if ply == 0:
+                    self.root_best = (move, score)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if not board.is_capture(move):
+                    killers = self.killers[ply]
+                    if move != killers[0]:
+                        killers[1], killers[0] = killers[0], move
+                    self.history[move.from_square * 64 + move.to_square] += depth * depth
+                break
+
+        if best_score <= original_alpha:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.tt[slot] = (key, depth, _to_tt(best_score, ply), flag, best_move)
+        return best_score
+
+    def search(self, board, max_depth, time_ms=None):
+        """
+        Iterative deepening. Returns (best_move, score) from the side to
+        move's point of view, using the deepest fully completed iteration.
+        """
+        pos = Position(board)
+        self.nodes = 0
+        self.deadline = time.monotonic() + time_ms / 1000.0 if time_ms else None
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        moves = list(board.legal_moves)
+        if not moves:
+            return None, (-MATE if board.is_check() else 0)
+
+        best = (moves[0], pos.evaluate())
+        for depth in range(1, max(1, max_depth) + 1):
+            self.root_best = None
+            try:
+                score = self.alphabeta(pos, depth, -MATE, MATE, 0)
+            except _SearchTimeout:
+                break
+            best = (self.root_best[0], score)
+            if abs(score) >= MATE_BOUND:
+                break  # forced mate found, deeper search won't change it
+        return best
+
+
+def _to_tt(score, ply):
+    # Mate scores are stored relative to the node, not the root
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _from_tt(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def _mate_in(score):
+    """Moves to mate for a mate score (negative when getting mated)."""
+    plies = MATE - abs(score)
+    moves = max(1, (plies + 1) // 2)
+    return moves if score > 0 else -moves
+
+
+def _skill_cap(skill):
+    """Depth cap for a Skill Level (0..20); full skill is uncapped."""
+    skill = max(0, min(20, int(skill)))
+    return None if skill == 20 else 1 + skill // 3
+
+
+class FallbackEngine:
+    """
+    Drop-in stand-in for the PyPI 'stockfish' object used by StockfishEngine:
+      - set_fen_position, set_depth, get_best_move/get_best_move_time
+      - get_evaluation, get_top_moves
+      - set_skill_level, set_elo_rating, update_engine_parameters
+    Skill / Elo limiting is approximated by capping the search depth.
+    """
+    def __init__(self, depth=20, tt_bits=TT_BITS):
+        self.depth = int(depth)
+        # Kept apart like Stockfish's "Skill Level" and "UCI_Elo" options;
+        # the Elo limit wins while UCI_LimitStrength is on.
+        self.skill_cap = None
+        self.elo_cap = None
+        self.board = chess.Board()
+        self.searcher = Searcher(tt_bits)
+
+    def _depth(self):
+        cap = self.elo_cap if self.elo_cap is not None else self.skill_cap
+        return min(self.depth, cap) if cap else self.depth
+
+    def set_fen_position(self, fen):
+        self.board = chess.Board(fen)
+
+    def set_depth(self, depth):
+        self.depth = int(depth)
+
+    def set_skill_level(self, skill):
+        # The wrapper turns UCI_LimitStrength off here as well
+        self.skill_cap = _skill_cap(skill)
+        self.elo_cap = None
+
+    def set_elo_rating(self, elo):
+        self.elo_cap = max(1, min(8, (int(elo) - 800) // 200 + 1))
+
+    def update_engine_parameters(self, parameters):
+        if "Skill Level" in parameters:
+            self.skill_cap = _skill_cap(parameters["Skill Level"])
+        if str(parameters.get("UCI_LimitStrength", "")).lower() == "false":
+            self.elo_cap = None
+        elif "UCI_Elo" in parameters:
+            self.set_elo_rating(parameters["UCI_Elo"])
+
+    def get_best_move(self):
+        move, _ = self.searcher.search(self.board, self._depth(), DEPTH_SEARCH_TIME_MS)
+        return move.uci() if move else None
+
+    def get_best_move_time(self, time_ms):
+        move, _ = self.searcher.search(self.board, self._depth(), time_ms)
+        return move.uci() if move else None
+
+    def get_evaluation(self):
+        """Same shape as the wrapper: White-relative centipawns or mate distance."""
+        _, score = self.searcher.search(self.board, self._depth(), DEPTH_SEARCH_TIME_MS)
+        if self.board.turn == chess.BLACK:
+            score = -score
+        if abs(score) >= MATE_BOUND:
+            return {"type": "mate", "value": _mate_in(score)}
+        return {"type": "cp", "value": score}
+
+    def get_top_moves(self, num_top_moves=5):
+        """
+        Root moves rescored one ply shallower, best first, White-relative.
+        Rescoring deepens one ply at a time within the same time cap as
+        get_evaluation and keeps the deepest pass that scored every move.
+        """
+        board = self.board
+        deadline = time.monotonic() + DEPTH_SEARCH_TIME_MS / 1000.0
+        # Fills the transposition table so the per-move searches are cheap
+        self.searcher.search(board, self._depth(), DEPTH_SEARCH_TIME_MS // 2)
+        sign = 1 if board.turn == chess.WHITE else -1
+        scored = []
+        for depth in range(min(self._depth(), TOP_MOVES_DEPTH)):
+            # The first (quiescence only) pass always completes so every move gets a score
+            self.searcher.deadline = deadline if scored else None
+            pos = Position(board)
+            current = []
+            try:
+                for move in board.legal_moves:
+                    pos.push(move)
+                    current.append((-self.searcher.alphabeta(pos, depth, -MATE, MATE, 1), move))
+                    pos.pop()
+            except _SearchTimeout:
+                break
+            scored = current
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        top = []
+        for score, move in scored[:num_top_moves]:
+            if abs(score) >= MATE_BOUND:
+                top.append({"Move": move.uci(), "Centipawn": None, "Mate": _mate_in(score) * sign})
+            else:
+                top.append({"Move": move.uci(), "Centipawn": score * sign, "Mate": None})
+        return top
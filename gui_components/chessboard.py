@@ -30,16 +30,18 @@ class ChessboardWidget(QWidget):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         light_color, dark_color = BOARD_THEMES[self.main_window.board_theme]
+        board = self.display_board()
         
         for row in range(8):
             for col in range(8):
                 color = QColor(light_color) if (row + col) % 2 == 0 else QColor(dark_color)
                 painter.fillRect(col * self.square_size, row * self.square_size, self.square_size, self.square_size, color)
 
-        if self.main_window.last_move:
+        last_move = self.display_last_move()
+        if last_move:
             highlight_color = QColor(255, 255, 0, 100)
-            from_sq = self.main_window.last_move.from_square
-            to_sq = self.main_window.last_move.to_square
+            from_sq = last_move.from_square
+            to_sq = last_move.to_square
             
             if self.main_window.board_flipped:
                 from_sq = 63 - from_sq
@@ -48,9 +50,24 @@ class ChessboardWidget(QWidget):
             painter.fillRect(chess.square_file(from_sq) * self.square_size, (7 - chess.square_rank(from_sq)) * self.square_size, self.square_size, self.square_size, highlight_color)
             painter.fillRect(chess.square_file(to_sq) * self.square_size, (7 - chess.square_rank(to_sq)) * self.square_size, self.square_size, self.square_size, highlight_color)
 
+        # Draw queued premoves
+        premove_color = QColor(220, 60, 60, 110)
+        for premove in self.main_window.premoves:
+            for sq in (premove.from_square, premove.to_square):
+                if self.main_window.board_flipped:
+                    sq = 63 - sq
+                painter.fillRect(chess.square_file(sq) * self.square_size, (7 - chess.square_rank(sq)) * self.square_size, self.square_size, self.square_size, premove_color)
+
         # Draw legal move hints
         if self.drag_start_square is not None:
-            legal_moves = [move for move in self.main_window.board.legal_moves if move.from_square == self.drag_start_square]
+            hint_board = self.main_window.board
+            if hint_board.turn == self.main_window.player_color:
+                legal_moves = [move for move in hint_board.legal_moves if move.from_square == self.drag_start_square]
+            else:
+                # Engine is thinking: hint premoves from the position they will be played in
+                hint_board = self.main_window.premove_board()
+                hint_board.turn = self.main_window.player_color
+                legal_moves = self.main_window.premove_moves(hint_board, self.drag_start_square)
             for move in legal_moves:
                 to_sq = move.to_square
                 if self.main_window.board_flipped:
@@ -63,7 +80,7 @@ class ChessboardWidget(QWidget):
                 painter.setBrush(QColor(0, 0, 0, 50))
                 painter.setPen(Qt.NoPen)
 
-                if self.main_window.board.is_capture(move):
+                if hint_board.piece_at(move.to_square) is not None or hint_board.is_en_passant(move):
                     radius = self.square_size / 2
                     painter.drawEllipse(QRectF(center_x - radius, center_y - radius, 2 * radius, 2 * radius))
                     painter.setBrush(QColor(light_color) if (row + col) % 2 == 0 else QColor(dark_color))
@@ -74,7 +91,7 @@ class ChessboardWidget(QWidget):
                     painter.drawEllipse(QRectF(center_x - radius, center_y - radius, 2 * radius, 2 * radius))
 
         for square in chess.SQUARES:
-            piece = self.main_window.board.piece_at(square)
+            piece = board.piece_at(square)
             if piece and not (self.dragging and square == self.drag_start_square):
                 renderer = self.piece_renderers[piece.symbol()]
                 
@@ -88,10 +105,27 @@ class ChessboardWidget(QWidget):
         if self.dragging and self.drag_renderer:
             self.drag_renderer.render(painter, QRectF(self.drag_pos.x(), self.drag_pos.y(), self.square_size, self.square_size))
 
+    def display_board(self):
+        """Position shown to the user: a reviewed ply, or the real board plus any queued premoves."""
+        if self.main_window.view_board is not None:
+            return self.main_window.view_board
+        if self.main_window.premoves:
+            return self.main_window.premove_board()
+        return self.main_window.board
+
+    def display_last_move(self):
+        view_ply = self.main_window.view_ply
+        if view_ply is None:
+            return self.main_window.last_move
+        return self.main_window.move_list_model.history.moves[view_ply - 1] if view_ply else None
+
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton and self.main_window.board.turn == self.main_window.player_color:
+        if event.button() == Qt.RightButton and self.main_window.premoves:
+            self.main_window.clear_premoves()
+            return
+        if event.button() == Qt.LeftButton and self.can_move():
             square = self.square_from_pos(event.pos())
-            piece = self.main_window.board.piece_at(square)
+            piece = self.display_board().piece_at(square)
             if piece and piece.color == self.main_window.player_color:
                 self.dragging = True
                 self.drag_start_square = square
@@ -99,6 +133,12 @@ class ChessboardWidget(QWidget):
                 self.drag_pos = event.pos() - QRectF(0, 0, self.square_size, self.square_size).center()
                 self.update()
 
+    def can_move(self):
+        """Player may drag on their own turn, or queue premoves while the engine thinks."""
+        if self.main_window.view_board is not None:
+            return False
+        return self.main_window.player_color is not None and not self.main_window.board.is_game_over()
+
     def mouseMoveEvent(self, event):
         if self.dragging:
             self.drag_pos = event.pos() - QRectF(0, 0, self.square_size, self.square_size).center()
@@ -110,7 +150,7 @@ class ChessboardWidget(QWidget):
             to_square = self.square_from_pos(event.pos())
             move = chess.Move(self.drag_start_square, to_square)
             
-            piece = self.main_window.board.piece_at(self.drag_start_square)
+            piece = self.display_board().piece_at(self.drag_start_square)
             if piece and piece.piece_type == chess.PAWN and (chess.square_rank(to_square) == 0 or chess.square_rank(to_square) == 7):
                 promo_dialog = PromotionDialog(self, is_white=piece.color, promotion_square=to_square, square_size=self.square_size)
                 promo_dialog.show()
@@ -122,8 +162,12 @@ class ChessboardWidget(QWidget):
                     self.update()
                     return
 
-            if move in self.main_window.board.legal_moves:
-                self.main_window.handle_move(move)
+            # The engine may have replied while the promotion dialog was open
+            if self.main_window.board.turn == self.main_window.player_color:
+                if move in self.main_window.board.legal_moves:
+                    self.main_window.handle_move(move)
+            elif to_square != self.drag_start_square:
+                self.main_window.queue_premove(move)
             self.update()
 
     def square_from_pos(self, pos):
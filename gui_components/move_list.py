@@ -0,0 +1,88 @@
+import chess
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# A full board copy every N plies keeps any position at most N-1 pushes away.
+SNAPSHOT_INTERVAL = 16
+
+
+class GameHistory:
+    """Moves and SAN of a game with periodic board snapshots for fast ply jumps."""
+    def __init__(self, board=None):
+        self.start = (board if board is not None else chess.Board()).copy(stack=False)
+        self.moves = []
+        self.sans = []
+        self.snapshots = [self.start.copy(stack=False)]
+        self.tip = self.start.copy(stack=False)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def append(self, move):
+        san = self.tip.san(move)
+        self.tip.push(move)
+        self.moves.append(move)
+        self.sans.append(san)
+        if len(self.moves) % SNAPSHOT_INTERVAL == 0:
+            self.snapshots.append(self.tip.copy(stack=False))
+        return san
+
+    def board_at(self, ply):
+        """Position after `ply` half-moves (0 is the starting position)."""
+        ply = max(0, min(ply, len(self.moves)))
+        board = self.snapshots[ply // SNAPSHOT_INTERVAL].copy(stack=False)
+        for move in self.moves[ply - ply % SNAPSHOT_INTERVAL:ply]:
+            board.push(move)
+        return board
+
+
+class MoveListModel(QAbstractListModel):
+    """One row per full move ("12. Nf3 Nc6"), rendered lazily by the view."""
+    def __init__(self, history=None, parent=None):
+        super().__init__(parent)
+        self.history = history if history is not None else GameHistory()
+
+    def set_history(self, history):
+        self.beginResetModel()
+        self.history = history
+        self.endResetModel()
+
+    def black_first(self):
+        return self.history.start.turn == chess.BLACK
+
+    def rowCount(self, parent=QModelIndex()):
+        # Without moves a Black-first game would otherwise report a "1. ..." row with no SAN
+        if parent.isValid() or not len(self.history):
+            return 0
+        return (len(self.history) + self.black_first() + 1) // 2
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole or not 0 <= index.row() < self.rowCount():
+            return None
+        row = index.row()
+        number = self.history.start.fullmove_number + row
+        white_ply = 2 * row - self.black_first()
+        sans = self.history.sans
+        if white_ply < 0:
+            return f"{number}. ... {sans[0]}"
+        if white_ply + 1 < len(sans):
+            return f"{number}. {sans[white_ply]} {sans[white_ply + 1]}"
+        return f"{number}. {sans[white_ply]}"
+
+    def append_move(self, move):
+        """Record a move and notify the view; returns its SAN."""
+        rows = self.rowCount()
+        row = self.row_for_ply(len(self.history) + 1)
+        if row == rows:
+            self.beginInsertRows(QModelIndex(), row, row)
+            san = self.history.append(move)
+            self.endInsertRows()
+        else:
+            san = self.history.append(move)
+            self.dataChanged.emit(self.index(row), self.index(row))
+        return san
+
+    def row_for_ply(self, ply):
+        return (ply - 1 + self.black_first()) // 2
+
+    def last_ply_in_row(self, row):
+        return min(2 * (row + 1) - self.black_first(), len(self.history))
@@ -0,0 +1,27 @@
+import chess.pgn
+from PyQt5.QtCore import QThread, pyqtSignal
+from .move_list import GameHistory
+
+
+class PgnLoaderThread(QThread):
+    """Parses the first game of a PGN file and builds its history off the GUI thread."""
+    game_loaded = pyqtSignal(object)
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def run(self):
+        try:
+            with open(self.path, encoding="utf-8", errors="replace") as f:
+                game = chess.pgn.read_game(f)
+            if game is None:
+                self.game_loaded.emit(None)
+                return
+            history = GameHistory(game.board())
+            for move in game.mainline_moves():
+                history.append(move)
+            self.game_loaded.emit(history)
+        except Exception as e:
+            print(f"Could not load PGN {self.path}: {e}")
+            self.game_loaded.emit(None)
@@ -4,16 +4,23 @@ import sys
 import time
 import chess
 from stockfish_engine import StockfishEngine
+from uci_trace import recorder_from_env
 
-def uci_loop():
+def uci_loop(recorder=None):
     """
     The main loop to handle UCI commands.
+    Incoming commands are logged to `recorder` when one is given.
     """
     board = chess.Board()
     engine = StockfishEngine()
 
     while True:
-        line = sys.stdin.readline().strip()
+        raw = sys.stdin.readline()
+        if not raw:
+            break
+        line = raw.strip()
+        if recorder and line:
+            recorder.incoming(line)
         if line == "quit":
             break
         elif line == "uci":
@@ -68,4 +75,11 @@ def uci_loop():
 
 
 if __name__ == "__main__":
-    uci_loop()
+    recorder = recorder_from_env()
+    if recorder:
+        sys.stdout = recorder.tee(sys.stdout)
+    try:
+        uci_loop(recorder)
+    finally:
+        if recorder:
+            recorder.close()
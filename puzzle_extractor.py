@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Extract tactical puzzles from PGN archives with StockfishEngine.
+
+Pipeline (each stage runs in its own worker processes, joined by bounded
+queues so memory stays flat however large the input is):
+
+    read PGN -> shallow eval-swing screen -> deep uniqueness check -> JSONL
+
+Each puzzle is one JSON line:
+    {"fen": ..., "moves": ["uci", ...], "rating": 1500, "game": 12, "ply": 34}
+`fen` is the position where the solver is to move, `moves` alternates
+solver / opponent moves and always ends on a solver move.
+
+Usage:
+    python puzzle_extractor.py games.pgn -o puzzles.jsonl
+"""
+
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+
+import chess
+import chess.pgn
+from stockfish_engine import StockfishEngine
+
+MATE_SCORE = 999          # same convention as StockfishEngine.get_evaluation
+SWING_THRESHOLD = 2.0     # pawns lost by the blunder
+WIN_THRESHOLD = 1.5       # solver must be at least this much better
+UNIQUE_MARGIN = 1.5       # gap between best and second-best move
+MAX_SOLVER_MOVES = 4
+QUEUE_SIZE = 256
+POLL_INTERVAL = 1.0       # seconds between stage liveness checks
+
+# Small per-worker engines: the pipeline gets its parallelism from processes.
+WORKER_PARAMETERS = {"Threads": 1, "Hash": 16}
+
+_DONE = None
+
+
+def iter_pgn_texts(path):
+    """Yield the raw text of each game without parsing it (cheap, streaming)."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = []
+        in_moves = False
+        for line in f:
+            if line.startswith("[") and in_moves:
+                yield "".join(lines)
+                lines = []
+                in_moves = False
+            elif line.strip() and not line.startswith("["):
+                in_moves = True
+            lines.append(line)
+        if in_moves:
+            yield "".join(lines)
+
+
+def _score(top_move, color):
+    """Score of a get_top_moves entry in pawns from `color`'s point of view."""
+    if top_move.get("Mate") is not None:
+        score = MATE_SCORE if top_move["Mate"] > 0 else -MATE_SCORE
+    else:
+        score = (top_move.get("Centipawn") or 0) / 100.0
+    return score if color == chess.WHITE else -score
+
+
+def estimate_rating(solution, board, swing, shallow_found):
+    """
+    Rough rating guess: longer lines, quiet key moves and moves the
+    shallow search missed make a puzzle harder.
+    """
+    rating = 1000 + 250 * ((len(solution) + 1) // 2 - 1)
+    first = chess.Move.from_uci(solution[0])
+    if not board.is_capture(first) and not board.gives_check(first):
+        rating += 300
+    if not shallow_found:
+        rating += 200
+    rating -= int(min(swing, 6.0) * 25)  # bigger blunders are easier to punish
+    return max(600, min(2800, rating))
+
+
+def read_stage(path, out_queue, workers):
+    for index, text in enumerate(iter_pgn_texts(path)):
+        out_queue.put((index, text))
+    for _ in range(workers):
+        out_queue.put(_DONE)
+
+
+def screen_stage(in_queue, out_queue, depth):
+    """Flag positions right after a large eval swing using a shallow search."""
+    engine = StockfishEngine(depth=depth, parameters=WORKER_PARAMETERS)
+    while True:
+        item = in_queue.get()
+        if item is _DONE:
+            break
+        if not engine.is_available():
+            continue
+        index, text = item
+        try:
+            game = chess.pgn.read_game(io.StringIO(text))
+        except Exception:
+            continue
+        if game is None:
+            continue
+
+        board = game.board()
+        before = engine.get_evaluation(board.fen())
+        for ply, move in enumerate(game.mainline_moves()):
+            mover = board.turn
+            board.push(move)
+            if board.is_game_over():
+                break
+            after = engine.get_evaluation(board.fen())
+            sign = 1 if mover == chess.WHITE else -1
+            swing = (before - after) * sign
+            # The opponent of the mover must now be winning, and not already have been
+            if swing >= SWING_THRESHOLD and -after * sign >= WIN_THRESHOLD and -before * sign < WIN_THRESHOLD:
+                top = engine.get_top_moves(board.fen(), 1)
+                out_queue.put({
+                    "fen": board.fen(),
+                    "game": index,
+                    "ply": ply + 1,
+                    "swing": swing,
+                    "shallow_move": top[0]["Move"] if top else None,
+                })
+            before = after
+
+
+def _unique_best(engine, board, color):
+    """Return the best move if it is the only winning one, else None."""
+    top = engine.get_top_moves(board.fen(), 2)
+    if not top:
+        return None
+    best = _score(top[0], color)
+    if best < WIN_THRESHOLD:
+        return None
+    if len(top) > 1:
+        second = _score(top[1], color)
+        if second >= WIN_THRESHOLD or best - second < UNIQUE_MARGIN:
+            return None
+    return top[0]["Move"]
+
+
+def confirm_stage(in_queue, out_queue, depth):
+    """Confirm candidates with a deep search and build the solution line."""
+    engine = StockfishEngine(depth=depth, parameters=WORKER_PARAMETERS)
+    while True:
+        candidate = in_queue.get()
+        if candidate is _DONE:
+            break
+        if not engine.is_available():
+            continue
+
+        board = chess.Board(candidate["fen"])
+        solver = board.turn
+        solution = []
+        while len(solution) < MAX_SOLVER_MOVES * 2:
+            best = _unique_best(engine, board, solver)
+            if best is None:
+                break
+            solution.append(best)
+            board.push_uci(best)
+            if board.is_game_over():
+                break
+            reply = engine.get_top_moves(board.fen(), 1)
+            if not reply:
+                break
+            solution.append(reply[0]["Move"])
+            board.push_uci(reply[0]["Move"])
+        if solution and len(solution) % 2 == 0:
+            solution.pop()  # end on the solver's move
+        if not solution:
+            continue
+
+        start = chess.Board(candidate["fen"])
+        out_queue.put({
+            "fen": candidate["fen"],
+            "moves": solution,
+            "rating": estimate_rating(solution, start, candidate["swing"],
+                                      candidate["shallow_move"] == solution[0]),
+            "game": candidate["game"],
+            "ply": candidate["ply"],
+        })
+
+
+def run_pipeline(pgn_path, output_path, screen_workers=None, confirm_workers=None,
+                 shallow_depth=8, deep_depth=18):
+    """Run the full pipeline and return the number of puzzles written."""
+    cpus = os.cpu_count() or 2
+    if confirm_workers is None:
+        confirm_workers = max(1, cpus // 2)
+    if screen_workers is None:
+        screen_workers = max(1, cpus - confirm_workers)
+
+    games = mp.Queue(QUEUE_SIZE)
+    candidates = mp.Queue(QUEUE_SIZE)
+    puzzles = mp.Queue(QUEUE_SIZE)
+
+    reader = mp.Process(target=read_stage, args=(pgn_path, games, screen_workers), daemon=True)
+    screeners = [mp.Process(target=screen_stage, args=(games, candidates, shallow_depth), daemon=True)
+                 for _ in range(screen_workers)]
+    confirmers = [mp.Process(target=confirm_stage, args=(candidates, puzzles, deep_depth), daemon=True)
+                  for _ in range(confirm_workers)]
+    for p in [reader] + screeners + confirmers:
+        p.start()
+
+    def close_stages():
+        # Downstream sentinels can only be sent once the upstream stage has drained
+        reader.join()
+        for p in screeners:
+            p.join()
+        for _ in confirmers:
+            candidates.put(_DONE)
+        for p in confirmers:
+            p.join()
+        puzzles.put(_DONE)
+
+    closer = threading.Thread(target=close_stages, daemon=True)
+    closer.start()
+
+    stages = [reader] + screeners + confirmers
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        while True:
+            try:
+                puzzle = puzzles.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                # A crashed stage would leave its neighbours blocked on the queues forever
+                failed = [p for p in stages if p.exitcode not in (None, 0)]
+                if failed:
+                    for p in stages:
+                        p.terminate()
+                    raise RuntimeError("Pipeline stage(s) exited unexpectedly: " +
+                                       ", ".join(f"{p.name} (exit code {p.exitcode})" for p in failed))
+                continue
+            if puzzle is _DONE:
+                break
+            out.write(json.dumps(puzzle) + "\n")
+            written += 1
+            if written % 100 == 0:
+                out.flush()
+    closer.join()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract tactical puzzles from PGN files.")
+    parser.add_argument("pgn", help="input PGN file")
+    parser.add_argument("-o", "--output", default="puzzles.jsonl", help="output JSONL file")
+    parser.add_argument("--screen-workers", type=int, default=None)
+    parser.add_argument("--confirm-workers", type=int, default=None)
+    parser.add_argument("--shallow-depth", type=int, default=8)
+    parser.add_argument("--deep-depth", type=int, default=18)
+    parser.add_argument("--allow-fallback", action="store_true",
+                        help="run on the built-in engine when no Stockfish binary is found")
+    args = parser.parse_args(argv)
+
+    engine = StockfishEngine(depth=1, parameters=WORKER_PARAMETERS)
+    if not engine.is_available():
+        print("Stockfish engine is not available. Please install Stockfish binary.")
+        return 1
+    if engine.is_fallback():
+        if not args.allow_fallback:
+            print("No Stockfish binary (locally or on the remote workers): refusing to extract puzzles "
+                  "with the weak built-in engine. Install Stockfish, set STOCKFISH_BINARY, or pass --allow-fallback.")
+            return 1
+        print("WARNING: extracting puzzles with the built-in fallback engine; "
+              "expect few, unreliable puzzles.")
+
+    count = run_pipeline(args.pgn, args.output, args.screen_workers, args.confirm_workers,
+                         args.shallow_depth, args.deep_depth)
+    print(f"Wrote {count} puzzles to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
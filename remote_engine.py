@@ -0,0 +1,258 @@
+"""
+Client side of the remote engine protocol (see engine_worker.py).
+
+Messages are newline-delimited JSON objects over TCP. A request names an
+operation plus the search settings to apply, so workers stay stateless:
+
+    {"op": "best_move", "fen": "...", "depth": 20, "elo": null, "time_ms": 3000}
+    {"op": "evaluation" | "top_moves" | "status", ...}
+
+and every reply is {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+Engine-side failures add "retry": true so the client tries another worker;
+the status result lists the worker's engine backends ("stockfish", "fallback").
+
+RemoteEnginePool keeps pooled connections to a list of workers, health
+checks them in the background and sends each request to the least loaded
+healthy worker, failing over to the next one on errors. RemoteEngine
+exposes the subset of the PyPI 'stockfish' API StockfishEngine uses, so it
+can be swapped in like FallbackEngine.
+"""
+
+import json
+import socket
+import threading
+
+DEFAULT_PORT = 7878
+CONNECT_TIMEOUT = 5.0
+REQUEST_TIMEOUT = 120.0
+HEALTH_INTERVAL = 5.0
+HEALTH_TIMEOUT = 2.0
+MAX_IDLE_CONNECTIONS = 8
+
+
+def parse_address(address):
+    """'host:port' / 'host' / (host, port) -> (host, port)."""
+    if isinstance(address, (tuple, list)):
+        return address[0], int(address[1])
+    host, _, port = address.strip().rpartition(":")
+    if not host:
+        return port, DEFAULT_PORT
+    return host, int(port)
+
+
+def send_message(wfile, message):
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+def read_message(rfile):
+    line = rfile.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    return json.loads(line)
+
+
+class _Connection:
+    def __init__(self, address):
+        self.sock = socket.create_connection(address, timeout=CONNECT_TIMEOUT)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+        self.wfile = self.sock.makefile("wb")
+
+    def call(self, message, timeout):
+        self.sock.settimeout(timeout)
+        send_message(self.wfile, message)
+        return read_message(self.rfile)
+
+    def close(self):
+        for f in (self.rfile, self.wfile, self.sock):
+            try:
+                f.close()
+            except OSError:
+                pass
+
+
+class _Worker:
+    def __init__(self, address):
+        self.address = address
+        self.lock = threading.Lock()
+        self.idle = []
+        self.healthy = True
+        self.in_flight = 0
+        self.engines = 1
+        self.busy = 0
+        self.backends = []
+
+    def load(self):
+        # The worker's own busy count includes our in-flight requests once it sees them
+        return max(self.in_flight, self.busy) / max(1, self.engines)
+
+    def call(self, message, timeout):
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+            self.in_flight += 1
+        try:
+            if conn is None:
+                conn = _Connection(self.address)
+            reply = conn.call(message, timeout)
+        except BaseException:
+            if conn is not None:
+                conn.close()
+            raise
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        with self.lock:
+            if len(self.idle) < MAX_IDLE_CONNECTIONS:
+                self.idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+        return reply
+
+    def mark_down(self):
+        with self.lock:
+            self.healthy = False
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+    def __repr__(self):
+        return f"{self.address[0]}:{self.address[1]}"
+
+
+class RemoteEnginePool:
+    """Connection pool with health checks, load-aware dispatch and failover."""
+    def __init__(self, addresses, health_interval=HEALTH_INTERVAL):
+        self.workers = [_Worker(parse_address(a)) for a in addresses]
+        if not self.workers:
+            raise ValueError("RemoteEnginePool needs at least one worker address")
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.check_health()
+        self._health_thread = threading.Thread(target=self._health_loop, args=(health_interval,), daemon=True)
+        self._health_thread.start()
+
+    def check_health(self):
+        for worker in self.workers:
+            try:
+                reply = worker.call({"op": "status"}, HEALTH_TIMEOUT)
+                status = reply["result"]
+                worker.engines = status["engines"]
+                worker.busy = status["busy"]
+                worker.backends = status.get("backends", [])
+                worker.healthy = True
+            except (OSError, ValueError, KeyError, TypeError, ConnectionError):
+                worker.mark_down()
+
+    def _health_loop(self, interval):
+        while not self._closed.wait(interval):
+            self.check_health()
+
+    def _pick(self, exclude):
+        with self._lock:
+            candidates = [w for w in self.workers if w not in exclude]
+            # Unhealthy workers are only tried once every healthy one has failed
+            healthy = [w for w in candidates if w.healthy]
+            candidates = healthy or candidates
+            if not candidates:
+                return None
+            return min(candidates, key=lambda w: w.load())
+
+    def request(self, message, timeout=REQUEST_TIMEOUT):
+        tried = []
+        last_error = None
+        while True:
+            worker = self._pick(tried)
+            if worker is None:
+                raise ConnectionError(f"No remote engine worker could serve the request: {last_error}")
+            tried.append(worker)
+            try:
+                reply = worker.call(message, timeout)
+            except (OSError, ValueError, ConnectionError) as e:
+                worker.mark_down()
+                last_error = f"{worker}: {e}"
+                continue
+            worker.healthy = True
+            if not reply.get("ok"):
+                if reply.get("retry"):
+                    last_error = f"{worker}: {reply.get('error')}"
+                    continue
+                raise RuntimeError(f"{worker}: {reply.get('error')}")
+            return reply["result"]
+
+    def is_fallback(self):
+        """True when any worker reported serving the built-in FallbackEngine."""
+        return any("fallback" in worker.backends for worker in self.workers)
+
+    def close(self):
+        self._closed.set()
+        for worker in self.workers:
+            worker.mark_down()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(addresses):
+    """Shared pool per worker list, so many StockfishEngines reuse connections."""
+    if isinstance(addresses, str):
+        addresses = [a for a in addresses.split(",") if a.strip()]
+    key = tuple(parse_address(a) for a in addresses)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = RemoteEnginePool(key)
+        return _pools[key]
+
+
+class RemoteEngine:
+    """
+    Stand-in for the PyPI 'stockfish' object that runs searches on remote
+    workers. Position and settings are kept locally and sent with each search.
+    """
+    def __init__(self, pool, depth=20):
+        self.pool = pool if isinstance(pool, RemoteEnginePool) else get_pool(pool)
+        self.fen = None
+        self.depth = int(depth)
+        self.elo = None
+        self.skill = None
+
+    def _request(self, op, **fields):
+        message = {"op": op, "fen": self.fen, "depth": self.depth, "elo": self.elo, "skill": self.skill}
+        message.update(fields)
+        return self.pool.request(message)
+
+    def is_fallback(self):
+        return self.pool.is_fallback()
+
+    def set_fen_position(self, fen):
+        self.fen = fen
+
+    def set_depth(self, depth):
+        self.depth = int(depth)
+
+    def set_skill_level(self, skill):
+        self.skill = int(skill)
+        self.elo = None
+
+    def set_elo_rating(self, elo):
+        self.elo = int(elo)
+
+    def update_engine_parameters(self, parameters):
+        if str(parameters.get("UCI_LimitStrength", "")).lower() == "false":
+            self.elo = None
+        elif "UCI_Elo" in parameters:
+            self.elo = int(parameters["UCI_Elo"])
+
+    def get_best_move(self):
+        return self._request("best_move")
+
+    def get_best_move_time(self, time_ms):
+        return self._request("best_move", time_ms=int(time_ms))
+
+    def get_evaluation(self):
+        return self._request("evaluation")
+
+    def get_top_moves(self, num_top_moves=5):
+        return self._request("top_moves", count=int(num_top_moves))
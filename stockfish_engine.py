@@ -1,5 +1,7 @@
 import os
 from stockfish import Stockfish
+from fallback_engine import FallbackEngine
+from remote_engine import RemoteEngine
 
 def _find_stockfish_binary(user_path=None):
     """
@@ -24,11 +26,15 @@ class StockfishEngine:
     """
     Thin wrapper around PyPI 'stockfish' (3.28.0) using only documented API:
       - Stockfish(path=..., depth=..., parameters={...})
-      - set_fen_position, get_best_move/get_best_move_time
+      - set_fen_position, get_best_move/get_best_move_time, get_top_moves
       - set_depth, set_skill_level, set_elo_rating
       - update_engine_parameters
+    Falls back to the built-in FallbackEngine (same API) when no binary is found.
+    With remote="host:port,..." (or $STOCKFISH_REMOTE) searches run on
+    engine_worker.py daemons through RemoteEngine instead.
+    `backend` says which one is in use: "stockfish", "remote" or "fallback".
     """
-    def __init__(self, depth=20, elo=None, path=None, parameters=None):
+    def __init__(self, depth=20, elo=None, path=None, parameters=None, remote=None):
         # Defaults from the docs with safe tweaks.
         default_params = {
             "Threads": 2,                  # speed/strength
@@ -55,32 +61,46 @@ class StockfishEngine:
         self.elo = int(elo) if elo is not None else None
 
         self.engine = None
-        binary = _find_stockfish_binary(path)
+        self.backend = None
+        if remote is None:
+            remote = os.environ.get("STOCKFISH_REMOTE")
+        binary = None if remote else _find_stockfish_binary(path)
 
         try:
-            if not binary:
+            if remote:
+                self.engine = RemoteEngine(remote, depth=self.depth)
+                self.backend = "remote"
+            elif not binary:
                 raise RuntimeError("No Stockfish binary found. Set STOCKFISH_BINARY or pass path=...")
-
-            # IMPORTANT: pass 'parameters' only when it's a dict
-            self.engine = Stockfish(path=binary, depth=self.depth, parameters=default_params)
-
-            # Apply mode
-            if self._elo_mode:
-                self.set_elo(self.elo)
             else:
-                self.set_depth(self.depth)
+                # IMPORTANT: pass 'parameters' only when it's a dict
+                self.engine = Stockfish(path=binary, depth=self.depth, parameters=default_params)
+                self.backend = "stockfish"
 
         except Exception as e:
             print(f"Error initializing Stockfish: {e}")
-            print("Ensure the Stockfish binary is installed and reachable. "
-                  "Set STOCKFISH_BINARY=/full/path/to/stockfish if needed.")
-            self.engine = None
+            print("Using the built-in fallback engine. For full strength, install Stockfish "
+                  "or set STOCKFISH_BINARY=/full/path/to/stockfish.")
+            self.engine = FallbackEngine(depth=self.depth)
+            self.backend = "fallback"
+
+        # Apply mode
+        if self._elo_mode:
+            self.set_elo(self.elo)
+        else:
+            self.set_depth(self.depth)
 
     # ------------- Public GUI API -------------
 
     def is_available(self):
         return self.engine is not None
 
+    def is_fallback(self):
+        """True when searches run on the much weaker built-in FallbackEngine, locally or on a worker."""
+        if self.backend == "remote":
+            return self.engine.is_fallback()
+        return self.backend == "fallback"
+
     def set_depth(self, depth: int):
         """Depth-limited (strong), disables Elo limiting."""
         self.depth = int(depth)
@@ -153,3 +173,17 @@ class StockfishEngine:
         except Exception as e:
             print(f"Error getting evaluation: {e}")
             return 0
+
+    def get_top_moves(self, board_fen, count=2):
+        """
+        Best `count` moves at the current depth as the wrapper reports them:
+        [{"Move": "e2e4", "Centipawn": 30, "Mate": None}, ...] (White's view).
+        """
+        if not self.engine:
+            return []
+        try:
+            self.engine.set_fen_position(board_fen)
+            return self.engine.get_top_moves(count)
+        except Exception as e:
+            print(f"Error getting top moves: {e}")
+            return []
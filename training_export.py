@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Export engine-labelled positions as memory-mapped NumPy training data.
+
+Positions are streamed from PGN / EPD / FEN inputs, scored in batches by
+StockfishEngine (with an eval cache so repeated positions are scored once),
+encoded with vectorized NumPy and written into preallocated `.npy` shards:
+
+    shard-00000.planes.npy    uint8   (N, 12, 64)  piece bitplanes
+    shard-00000.features.npy  uint8   (N, 5)       side to move + castling rights
+    shard-00000.evals.npy     float32 (N,)         eval in pawns, White's view
+    index.json                shard list with row counts and global offsets
+
+Plane order is white P N B R Q K, then black p n b r q k; squares are a1..h8.
+Evals follow StockfishEngine.get_evaluation: mate scores are +-999. An engine
+failure aborts the export (index.json still covers every row written) rather
+than storing a made-up eval.
+The last shard is preallocated at full size; only `count` rows are valid.
+TrainingShards reads any slice through np.load(mmap_mode="r") without copying
+whole files.
+
+Usage:
+    python training_export.py games.pgn more.epd -o data/ --depth 12 --engines 4
+    zcat big.pgn.gz | python training_export.py - --format pgn -o data/
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import chess.pgn
+import numpy as np
+from stockfish_engine import StockfishEngine
+
+PLANES = 12
+FEATURE_NAMES = ["white_to_move", "white_kingside", "white_queenside", "black_kingside", "black_queenside"]
+DEFAULT_SHARD_SIZE = 1 << 18   # ~200 MB of planes per shard
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_CACHE_SIZE = 1 << 20
+INDEX_NAME = "index.json"
+MATE_SCORE = 999          # same convention as StockfishEngine.get_evaluation
+
+# Single-threaded engines: parallelism comes from running several of them.
+WORKER_PARAMETERS = {"Threads": 1, "Hash": 16}
+
+_CASTLING_SQUARES = np.array([chess.BB_H1, chess.BB_A1, chess.BB_H8, chess.BB_A8], dtype=np.uint64)
+
+
+# ------------- Position sources -------------
+
+def _detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    return {".pgn": "pgn", ".epd": "epd"}.get(ext, "fen")
+
+
+def iter_positions(path, fmt=None, skip_plies=0, every=1):
+    """Yield boards from a PGN (every mainline position), EPD or FEN-per-line source."""
+    fmt = fmt or _detect_format(path)
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+    try:
+        if fmt == "pgn":
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves()):
+                    if ply >= skip_plies and (ply - skip_plies) % every == 0:
+                        yield board.copy(stack=False)
+                    board.push(move)
+        else:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    board = chess.Board.from_epd(line)[0] if fmt == "epd" else chess.Board(line)
+                except ValueError:
+                    continue
+                yield board
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ------------- Encoding -------------
+
+def encode_boards(boards):
+    """Vectorized encoding: (N, 12, 64) uint8 bitplanes and (N, 5) uint8 features."""
+    n = len(boards)
+    by_type = np.array([[b.pawns, b.knights, b.bishops, b.rooks, b.queens, b.kings] for b in boards],
+                       dtype=np.uint64).reshape(n, 6)
+    by_color = np.array([[b.occupied_co[chess.WHITE], b.occupied_co[chess.BLACK]] for b in boards],
+                        dtype=np.uint64).reshape(n, 2)
+    masks = (by_color[:, :, None] & by_type[:, None, :]).reshape(n, PLANES)
+    # Little-endian bytes + little bit order puts square 0 (a1) first
+    planes = np.unpackbits(masks.astype("<u8").view(np.uint8).reshape(n, PLANES, 8),
+                           axis=2, bitorder="little")
+
+    turn = np.array([b.turn for b in boards], dtype=np.uint8).reshape(n, 1)
+    rights = np.array([b.castling_rights for b in boards], dtype=np.uint64).reshape(n, 1)
+    castling = (rights & _CASTLING_SQUARES) != 0
+    features = np.concatenate([turn, castling.astype(np.uint8)], axis=1)
+    return planes, features
+
+
+# ------------- Scoring -------------
+
+class EvalCache:
+    """LRU of evals keyed by position (EPD without move counters)."""
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class BatchScorer:
+    """Scores batches of boards across several engines, skipping cached positions."""
+    def __init__(self, engines, cache=None):
+        self.engines = queue.Queue()
+        for engine in engines:
+            self.engines.put(engine)
+        self.pool = ThreadPoolExecutor(max_workers=len(engines))
+        self.cache = cache if cache is not None else EvalCache()
+
+    def _evaluate(self, fen):
+        # Query the backend directly: StockfishEngine.get_evaluation reports
+        # any failure as 0, which must never become a label or a cache entry.
+        engine = self.engines.get()
+        try:
+            engine.engine.set_fen_position(fen)
+            ev = engine.engine.get_evaluation()
+        except Exception as e:
+            raise RuntimeError(f"engine failed to evaluate {fen!r}: {e}") from e
+        finally:
+            self.engines.put(engine)
+        if ev["type"] == "cp":
+            return ev["value"] / 100.0
+        if ev["type"] == "mate":
+            return MATE_SCORE if ev["value"] > 0 else -MATE_SCORE
+        raise RuntimeError(f"unexpected evaluation for {fen!r}: {ev!r}")
+
+    def score(self, boards):
+        keys = [b.epd() for b in boards]
+        values = [self.cache.get(key) for key in keys]
+        missing = {}
+        for board, key, value in zip(boards, keys, values):
+            if value is None and key not in missing:
+                missing[key] = board.fen()
+        scored = dict(zip(missing, self.pool.map(self._evaluate, missing.values())))
+        for key, value in scored.items():
+            self.cache.put(key, value)
+        evals = [value if value is not None else scored[key] for key, value in zip(keys, values)]
+        return np.array(evals, dtype=np.float32)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+# ------------- Shards -------------
+
+class ShardWriter:
+    """Fills preallocated memory-mapped .npy shards and keeps index.json current."""
+    def __init__(self, out_dir, shard_size=DEFAULT_SHARD_SIZE):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.shards = []
+        self.total = 0
+        self.arrays = None
+        self.filled = 0
+
+    def _open_shard(self):
+        name = f"shard-{len(self.shards):05d}"
+        files = {kind: f"{name}.{kind}.npy" for kind in ("planes", "features", "evals")}
+        shapes = {"planes": ((self.shard_size, PLANES, 64), np.uint8),
+                  "features": ((self.shard_size, len(FEATURE_NAMES)), np.uint8),
+                  "evals": ((self.shard_size,), np.float32)}
+        self.arrays = {kind: np.lib.format.open_memmap(os.path.join(self.out_dir, files[kind]), mode="w+",
+                                                       dtype=shapes[kind][1], shape=shapes[kind][0])
+                       for kind in files}
+        self.shards.append(dict(files, start=self.total, count=0))
+        self.filled = 0
+
+    def _close_shard(self):
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = None
+        self.write_index()
+
+    def write(self, planes, features, evals):
+        offset = 0
+        while offset < len(evals):
+            if self.arrays is None:
+                self._open_shard()
+            n = min(len(evals) - offset, self.shard_size - self.filled)
+            rows = slice(self.filled, self.filled + n)
+            self.arrays["planes"][rows] = planes[offset:offset + n]
+            self.arrays["features"][rows] = features[offset:offset + n]
+            self.arrays["evals"][rows] = evals[offset:offset + n]
+            self.filled += n
+            self.total += n
+            self.shards[-1]["count"] = self.filled
+            offset += n
+            if self.filled == self.shard_size:
+                self._close_shard()
+
+    def write_index(self):
+        index = {
+            "format": 1,
+            "total": self.total,
+            "shard_size": self.shard_size,
+            "plane_order": "PNBRQKpnbrqk",
+            "features": FEATURE_NAMES,
+            "evals": "pawns, White's point of view, mate = +-999",
+            "shards": self.shards,
+        }
+        tmp = os.path.join(self.out_dir, INDEX_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, os.path.join(self.out_dir, INDEX_NAME))
+
+    def close(self):
+        if self.arrays is not None:
+            self._close_shard()
+        else:
+            self.write_index()
+
+
+class TrainingShards:
+    """Read-only view over an exported directory; slices come straight from the memmaps."""
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, INDEX_NAME), encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.shards = [
+            {kind: np.load(os.path.join(out_dir, shard[kind]), mmap_mode="r")[:shard["count"]]
+             for kind in ("planes", "features", "evals")}
+            for shard in self.index["shards"]
+        ]
+        self.starts = [shard["start"] for shard in self.index["shards"]]
+
+    def __len__(self):
+        return self.index["total"]
+
+    def slice(self, start, stop):
+        """(planes, features, evals) for global rows [start, stop); views when inside one shard."""
+        start, stop = max(0, start), min(stop, len(self))
+        parts = []
+        for shard, first in zip(self.shards, self.starts):
+            count = len(shard["evals"])
+            lo, hi = max(start, first), min(stop, first + count)
+            if lo < hi:
+                parts.append(tuple(shard[kind][lo - first:hi - first] for kind in ("planes", "features", "evals")))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return (np.empty((0, PLANES, 64), np.uint8), np.empty((0, len(FEATURE_NAMES)), np.uint8),
+                    np.empty((0,), np.float32))
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+# ------------- Driver -------------
+
+def export(sources, out_dir, engines, fmt=None, batch_size=DEFAULT_BATCH_SIZE,
+           shard_size=DEFAULT_SHARD_SIZE, skip_plies=0, every=1, cache_size=DEFAULT_CACHE_SIZE):
+    """Score and encode every position from `sources`; returns (rows written, EvalCache)."""
+    scorer = BatchScorer(engines, EvalCache(cache_size))
+    writer = ShardWriter(out_dir, shard_size)
+    try:
+        for source in sources:
+            for boards in batched(iter_positions(source, fmt, skip_plies, every), batch_size):
+                evals = scorer.score(boards)
+                planes, features = encode_boards(boards)
+                writer.write(planes, features, evals)
+    finally:
+        writer.close()
+        scorer.close()
+    return writer.total, scorer.cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export engine-scored positions to NumPy shards.")
+    parser.add_argument("sources", nargs="+", help="PGN / EPD / FEN files, or - for stdin")
+    parser.add_argument("-o", "--output", default="training_data", help="output directory")
+    parser.add_argument("--format", choices=["pgn", "epd", "fen"], default=None,
+                        help="input format (default: from the file extension)")
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--engines", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--remote", default=None, help="score on engine_worker.py daemons (host:port,...)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    parser.add_argument("--skip-plies", type=int, default=0, help="skip opening plies of PGN games")
+    parser.add_argument("--every", type=int, default=1, help="keep every Nth PGN position")
+    parser.add_argument("--allow-fallback", action="store_true",
+                        help="label with the built-in engine when no Stockfish binary is found")
+    args = parser.parse_args(argv)
+
+    engines = [StockfishEngine(depth=args.depth, parameters=WORKER_PARAMETERS, remote=args.remote)
+               for _ in range(args.engines)]
+    if engines[0].is_fallback():
+        if not args.allow_fallback:
+            print("No Stockfish binary (locally or on the remote workers): refusing to label positions "
+                  "with the weak built-in engine. Install Stockfish, set STOCKFISH_BINARY, use --remote, or pass --allow-fallback.")
+            return 1
+        print("WARNING: labelling with the built-in fallback engine; evals will be far weaker "
+              f"than depth {args.depth} Stockfish.")
+    try:
+        total, cache = export(args.sources, args.output, engines, args.format, args.batch_size,
+                              args.shard_size, args.skip_plies, args.every, args.cache_size)
+    except RuntimeError as e:
+        print(f"Export aborted: {e}")
+        return 1
+    print(f"Wrote {total} positions to {args.output} "
+          f"(eval cache: {cache.hits} hits, {cache.misses} misses)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
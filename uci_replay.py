@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Replay recorded UCI traces (see uci_trace.py) against main.py or any UCI binary.
+
+Runs many sessions in parallel, reports latency percentiles for `isready`,
+`position` and `go` -> `bestmove`, and flags responses that differ from
+the recording. `info` lines are only compared with --strict since they
+carry timings.
+
+Usage:
+    python uci_replay.py traces/*.trace --sessions 32 --parallel 8
+    python uci_replay.py session.trace --engine /usr/local/bin/stockfish
+"""
+
+import argparse
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from uci_trace import read_trace
+
+DEFAULT_ENGINE = [sys.executable, os.path.join(os.path.dirname(os.path.realpath(__file__)), "main.py")]
+RESPONSE_TIMEOUT = 60.0
+# Commands whose latency we measure; `position` has no reply of its own so it
+# is followed by an `isready` probe and timed until `readyok`.
+TIMED = ("isready", "position", "go")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _terminator(command):
+    """Line prefix that ends the reply to `command`, or None if it has no reply."""
+    name = command.split(" ", 1)[0]
+    return {"uci": "uciok", "isready": "readyok", "go": "bestmove"}.get(name)
+
+
+class EngineProcess:
+    def __init__(self, cmd):
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._pump, daemon=True).start()
+
+    def _pump(self):
+        for line in self.proc.stdout:
+            self.lines.put(line.rstrip("\n"))
+        self.lines.put(None)
+
+    def send(self, command):
+        self.proc.stdin.write(command + "\n")
+        self.proc.stdin.flush()
+
+    def read_until(self, prefix, timeout=RESPONSE_TIMEOUT):
+        """Collect output lines up to and including the first starting with `prefix`."""
+        collected, found = self.read_for(prefix, timeout)
+        if not found:
+            raise TimeoutError(f"no '{prefix}' within {timeout:.0f}s")
+        return collected
+
+    def read_for(self, prefix, timeout):
+        """Like read_until, but returns (lines, found) when `timeout` runs out."""
+        collected = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return collected, False
+            try:
+                line = self.lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                raise EOFError(f"engine exited before '{prefix}'")
+            collected.append(line)
+            if line.startswith(prefix):
+                return collected, True
+
+    def drain(self):
+        collected = []
+        while True:
+            try:
+                line = self.lines.get_nowait()
+            except queue.Empty:
+                return collected
+            if line is not None:
+                collected.append(line)
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def _comparable(lines, strict):
+    return [line for line in lines if strict or not line.startswith("info")]
+
+
+def replay_session(trace_path, engine_cmd, strict=False):
+    """Replay one trace; returns (latencies {name: [ms]}, mismatches, error)."""
+    latencies = {name: [] for name in TIMED}
+    mismatches = []
+    engine = None
+    try:
+        exchanges = read_trace(trace_path)
+        engine = EngineProcess(engine_cmd)
+        go_start = None
+        for i, (command, sent_us, expected) in enumerate(exchanges):
+            name = command.split(" ", 1)[0]
+            next_name = exchanges[i + 1][0].split(" ", 1)[0] if i + 1 < len(exchanges) else ""
+            start = time.perf_counter()
+            engine.send(command)
+            compare = True
+
+            if name == "go" and next_name in ("stop", "ponderhit"):
+                # Let the search run as long as it did in the recording. Engines
+                # may answer before the stop arrives (main.py ignores stop): then
+                # the go exchange holds the bestmove and the stop expects nothing.
+                got, answered = engine.read_for("bestmove", max(0, exchanges[i + 1][1] - sent_us) / 1e6)
+                if answered:
+                    latencies["go"].append((time.perf_counter() - start) * 1000)
+                else:
+                    # Still searching; its bestmove is checked against the stop exchange
+                    go_start = start
+                    compare = False
+            elif name in ("stop", "ponderhit") and go_start is not None:
+                got = engine.read_until("bestmove")
+                latencies["go"].append((time.perf_counter() - go_start) * 1000)
+                go_start = None
+            elif name == "position":
+                engine.send("isready")
+                got = engine.read_until("readyok")[:-1]
+                latencies["position"].append((time.perf_counter() - start) * 1000)
+            elif _terminator(command):
+                got = engine.read_until(_terminator(command))
+                if name in latencies:
+                    latencies[name].append((time.perf_counter() - start) * 1000)
+            else:
+                got = engine.drain()
+
+            expected_lines = _comparable([text for _, text in expected], strict)
+            if compare and _comparable(got, strict) != expected_lines:
+                mismatches.append((i, command, expected_lines, _comparable(got, strict)))
+        return latencies, mismatches, None
+    except (TimeoutError, EOFError, OSError, ValueError) as e:
+        return latencies, mismatches, str(e)
+    finally:
+        if engine is not None:
+            engine.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay UCI traces and report latency and mismatches.")
+    parser.add_argument("traces", nargs="+", help="trace files recorded with UCI_TRACE")
+    parser.add_argument("--engine", default=None, help="engine command line (default: main.py)")
+    parser.add_argument("--sessions", type=int, default=None, help="total sessions (default: one per trace)")
+    parser.add_argument("--parallel", type=int, default=os.cpu_count() or 2, help="concurrent sessions")
+    parser.add_argument("--strict", action="store_true", help="also compare info lines")
+    parser.add_argument("--max-reported", type=int, default=20, help="mismatches to print")
+    args = parser.parse_args(argv)
+
+    engine_cmd = shlex.split(args.engine) if args.engine else DEFAULT_ENGINE
+    sessions = args.sessions or len(args.traces)
+    jobs = [args.traces[i % len(args.traces)] for i in range(sessions)]
+
+    latencies = {name: [] for name in TIMED}
+    mismatches = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        results = pool.map(lambda path: (path, replay_session(path, engine_cmd, args.strict)), jobs)
+        for path, (session_latencies, session_mismatches, error) in results:
+            for name, values in session_latencies.items():
+                latencies[name].extend(values)
+            mismatches.extend((path,) + m for m in session_mismatches)
+            if error:
+                errors.append((path, error))
+
+    print(f"{sessions} sessions, {args.parallel} in parallel")
+    print(f"{'command':<10}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name in TIMED:
+        values = sorted(latencies[name])
+        if not values:
+            continue
+        print(f"{name:<10}{len(values):>8}{percentile(values, 50):>10.1f}{percentile(values, 90):>10.1f}"
+              f"{percentile(values, 99):>10.1f}{values[-1]:>10.1f}")
+
+    for path, error in errors:
+        print(f"ERROR {path}: {error}")
+    print(f"{len(mismatches)} mismatched responses")
+    for path, index, command, expected, got in mismatches[:args.max_reported]:
+        print(f"  {path} #{index} '{command}'")
+        print(f"    expected: {expected}")
+        print(f"    got:      {got}")
+    return 1 if mismatches or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
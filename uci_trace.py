@@ -0,0 +1,94 @@
+"""
+Compact UCI session traces.
+
+One trace file holds one session, one line per message:
+
+    <microseconds since session start> <direction> <text>
+
+where direction is ">" for commands sent to the engine and "<" for lines
+the engine printed. Lines starting with "#" are comments.
+
+Recording is opt-in: set UCI_TRACE to a file path, or to an existing
+directory to get one trace file per session, before starting main.py.
+"""
+
+import os
+import time
+
+TRACE_HEADER = "# uci-trace v1"
+INCOMING = ">"
+OUTGOING = "<"
+
+
+class TraceRecorder:
+    def __init__(self, path):
+        if os.path.isdir(path):
+            name = f"uci-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.trace"
+            path = os.path.join(path, name)
+        self.path = path
+        # Line buffered so a killed session still leaves a usable trace
+        self.file = open(path, "w", encoding="utf-8", buffering=1)
+        self.file.write(TRACE_HEADER + "\n")
+        self.start = time.monotonic_ns()
+
+    def _write(self, direction, text):
+        elapsed_us = (time.monotonic_ns() - self.start) // 1000
+        self.file.write(f"{elapsed_us} {direction} {text}\n")
+
+    def incoming(self, text):
+        self._write(INCOMING, text)
+
+    def outgoing(self, text):
+        self._write(OUTGOING, text)
+
+    def tee(self, stream):
+        """Wrap an output stream so every line written to it is recorded."""
+        return _TeeStream(stream, self)
+
+    def close(self):
+        self.file.close()
+
+
+class _TeeStream:
+    def __init__(self, stream, recorder):
+        self.stream = stream
+        self.recorder = recorder
+        self.pending = ""
+
+    def write(self, text):
+        self.stream.write(text)
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.recorder.outgoing(line)
+        return len(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def recorder_from_env():
+    """TraceRecorder for $UCI_TRACE, or None when recording is off."""
+    path = os.environ.get("UCI_TRACE")
+    return TraceRecorder(path) if path else None
+
+
+def read_trace(path):
+    """
+    Parse a trace into exchanges: [(command, sent_us, [(us, line), ...]), ...]
+    Each exchange holds the engine output seen before the next command;
+    start-up output printed before the first command is attributed to it.
+    """
+    exchanges = []
+    preamble = []
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.rstrip("\n")
+            if not raw or raw.startswith("#"):
+                continue
+            stamp, direction, text = (raw.split(" ", 2) + [""])[:3]
+            if direction == INCOMING:
+                exchanges.append((text, int(stamp), preamble if not exchanges else []))
+            elif direction == OUTGOING:
+                (exchanges[-1][2] if exchanges else preamble).append((int(stamp), text))
+    return exchanges